@@ -1,7 +1,8 @@
+from contextlib import asynccontextmanager
 from typing import Literal, Optional
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, Response
+from fastapi.responses import Response
 from utils import (
     load_config,
     get_amiablog_version,
@@ -10,17 +11,43 @@ from utils import (
     I18nProvider,
     HLJSLanguageManager,
     RSSProvider,
+    ResponseCache,
 )
+from loguru import logger
+import hashlib
+import json
 import time
 
 __VERSION__ = get_amiablog_version()
+# Constant, so it is serialized once instead of on every health check
+HEALTH_BODY = json.dumps(
+    {"status": "ok", "server": "AmiaBlog", "version": __VERSION__},
+    separators=(",", ":"),
+).encode()
 
-app = FastAPI()
+with open("static/favicon.ico", "rb") as f:
+    FAVICON = f.read()
+FAVICON_HEADERS = {
+    "Cache-Control": "public, max-age=86400",
+    "ETag": f'"{hashlib.sha256(FAVICON).hexdigest()}"',
+}
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if config.prerender_pages and not config.disable_template_cache:
+        await prerender_pages()
+    yield
+
+
+app = FastAPI(lifespan=lifespan)
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 config = load_config()
 hljs_manager = HLJSLanguageManager(config.site_settings.hljs_languages)
-posts_manager = PostsManager(search_method=config.search_method)
+posts_manager = PostsManager(
+    search_method=config.search_method, hljs_manager=hljs_manager
+)
 i18n = I18nProvider(config.site_language)
 renderer = TemplateRenderer(
     disable_cache=config.disable_template_cache,
@@ -33,23 +60,46 @@ renderer = TemplateRenderer(
     },
 )
 rss_provider = RSSProvider(config, posts_manager)
+response_cache = ResponseCache(posts_manager, disabled=config.disable_template_cache)
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is None:
+        return False
+    return any(
+        tag.strip().removeprefix("W/") in (etag, "*")
+        for tag in if_none_match.split(",")
+    )
 
 
 @app.get("/favicon.ico")
-async def favicon():
-    return FileResponse("static/favicon.ico")
+async def favicon(request: Request):
+    if is_not_modified(request, FAVICON_HEADERS["ETag"]):
+        return Response(status_code=304, headers=FAVICON_HEADERS)
+    return Response(
+        FAVICON, media_type="image/vnd.microsoft.icon", headers=FAVICON_HEADERS
+    )
 
 
 @app.get("/")
 async def mainpage():
-    return renderer.render("index.html", recent_posts=posts_manager.recent_posts())
+    return response_cache.get(
+        ("index",),
+        lambda: renderer.render(
+            "index.html", recent_posts=posts_manager.recent_posts()
+        ),
+    )
 
 
 @app.get("/feed")
-async def rss():
+async def rss(request: Request):
+    feed, etag = rss_provider.get_feed()
+    headers = {"Cache-Control": "public, max-age=300", "ETag": etag}
+    if is_not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
     return Response(
-        rss_provider.generate_rss(),
-        media_type="application/rss+xml; charset=utf-8",
+        feed, media_type="application/rss+xml; charset=utf-8", headers=headers
     )
 
 
@@ -60,11 +110,12 @@ async def view_post(slug: str):
         return renderer.render(
             "error.html", status_code=404, error=i18n.error_post_not_found
         )
-    hljs_languages = hljs_manager.get_markdown_languages(post.content)
-    available_languages = [
-        i for i in hljs_languages if i in hljs_manager.available_languages
-    ]
-    return renderer.render("post.html", post=post, hljs_languages=available_languages)
+    return response_cache.get(
+        ("post", slug),
+        lambda: renderer.render(
+            "post.html", post=post, hljs_languages=post.hljs_languages
+        ),
+    )
 
 
 @app.get("/posts")
@@ -73,22 +124,38 @@ async def view_posts(
 ):
     if not order:
         order = "modified_desc"
-    posts = posts_manager.order_by(list(posts_manager.posts.values()), order)
-    return renderer.render("posts.html", posts=posts, order=order)
+    return response_cache.get(
+        ("posts", order),
+        lambda: renderer.render(
+            "posts.html",
+            posts=posts_manager.ordered_posts(order),
+            order=order,
+        ),
+    )
 
 
 @app.get("/tag/{tag:str}")
 async def view_tag(tag: str):
-    posts = posts_manager.order_by(posts_manager.get_posts_by_tag(tag), "modified_desc")
+    posts = posts_manager.ordered_posts_by_tag(tag, "modified_desc")
     if len(posts) == 0:
         return renderer.render(
             "error.html", status_code=404, error=i18n.error_tag_not_found
         )
-    return renderer.render("tag.html", posts=posts, tag=tag)
+    # Tags match case-insensitively, so every casing shares one cached page,
+    # titled with the tag as the posts spell it
+    key = tag.lower()
+    name = next(name for name in posts[0].metadata.tags if name.lower() == key)
+    return response_cache.get(
+        ("tag", key), lambda: renderer.render("tag.html", posts=posts, tag=name)
+    )
 
 
 @app.get("/tags")
 async def view_tags():
+    return response_cache.get(("tags",), render_tags)
+
+
+def render_tags() -> Response:
     tags = posts_manager.list_tags(order_by="post_count")
     return renderer.render("tags.html", tags=tags, n_tags=len(tags))
 
@@ -138,4 +205,26 @@ async def view_friend_links():
 
 @app.get("/api/health")
 async def root():
-    return {"status": "ok", "server": "AmiaBlog", "version": __VERSION__}
+    return Response(HEALTH_BODY, media_type="application/json")
+
+
+async def prerender_pages():
+    """
+    Renders every post-derived page into the response cache, so no request has to render one.
+    """
+    logger.info("Prerendering pages")
+    start_time = time.time()
+    await mainpage()
+    await view_tags()
+    for order in posts_manager.sorted_posts:
+        await view_posts(order)
+    for slug in posts_manager.posts:
+        await view_post(slug)
+    # Keyed like the tag page cache, so each tag is rendered once whatever its casing
+    for tag in posts_manager.tag_posts:
+        await view_tag(tag)
+    rss_provider.get_feed()
+    end_time = time.time()
+    logger.info(
+        f"Prerendered {len(response_cache.responses)} pages in {(end_time - start_time)*1000:.4f}ms"
+    )
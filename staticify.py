@@ -30,7 +30,9 @@ class AmiaBlogStaticGenerator:
             self.config.site_settings.hljs_languages
         )
         self.posts_manager = PostsManager(
-            search_method="fullmatch", build_search_index=False
+            search_method="fullmatch",
+            build_search_index=False,
+            hljs_manager=self.hljs_manager,
         )
         self.i18n = I18nProvider(self.config.site_language)
         self.renderer = TemplateRenderer(
@@ -81,9 +83,7 @@ class AmiaBlogStaticGenerator:
         self.renderer.render_static(
             os.path.join(self.destination, "posts.html"),
             "posts.html",
-            posts=self.posts_manager.order_by(
-                list(self.posts_manager.posts.values()), "modified_desc"
-            ),
+            posts=self.posts_manager.ordered_posts("modified_desc"),
         )
         logger.info("\tRendering: tags.html")
         tags = self.posts_manager.list_tags(order_by="post_count")
@@ -114,18 +114,14 @@ class AmiaBlogStaticGenerator:
             os.mkdir(os.path.join(self.destination, "post"))
             for slug, post in self.posts_manager.posts.items():
                 logger.info(f"\tRendering: post/{slug}.html")
-                hljs_languages = self.hljs_manager.get_markdown_languages(post.content)
-                available_languages = [
-                    i
-                    for i in hljs_languages
-                    if i in self.hljs_manager.available_languages
-                ]
                 with open(
                     os.path.join(self.destination, f"post/{slug}.html"), "w+"
                 ) as f:
                     f.write(
                         self.renderer.render_to_plain_text(
-                            "post.html", post=post, hljs_languages=available_languages
+                            "post.html",
+                            post=post,
+                            hljs_languages=post.hljs_languages,
                         )
                     )
 
@@ -137,8 +133,8 @@ class AmiaBlogStaticGenerator:
             os.mkdir(os.path.join(self.destination, "tag"))
             for tag in tags:
                 logger.info(f"\tRendering: tag/{tag.name}.html")
-                posts = self.posts_manager.order_by(
-                    self.posts_manager.get_posts_by_tag(tag.name), "modified_desc"
+                posts = self.posts_manager.ordered_posts_by_tag(
+                    tag.name, "modified_desc"
                 )
                 with open(
                     os.path.join(self.destination, f"tag/{tag.name}.html"), "w+"
@@ -164,7 +160,7 @@ class AmiaBlogStaticGenerator:
         logger.info("Loading site data")
         self.load_data()
         logger.info("Site data loaded successfully.")
-        self.renderer.static_params.update({"static_build_time": build_time})
+        self.renderer.update_static_params(static_build_time=build_time)
         self.init_dist_dir()
         logger.info("Copying static assets")
         self.init_static_assets()
@@ -1,22 +1,41 @@
 import datetime
+import hashlib
 import json
 import os
+import pickle
+import re
 import sqlite3
+import sys
 import time
 import jieba_fast
-from typing import Any, Callable, Dict, List, Literal, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from operator import attrgetter
+from typing import Any, Callable, Dict, List, Literal, Optional, Set, Tuple
 from urllib.parse import quote
 
-import htmlmin
 import httpx
+import minify_html
 import yaml
-from fastapi.responses import HTMLResponse
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from fastapi.responses import HTMLResponse, Response
+from jinja2 import (
+    Environment,
+    FileSystemBytecodeCache,
+    FileSystemLoader,
+    select_autoescape,
+)
 from markupsafe import Markup, escape
 from pydantic import BaseModel
 from loguru import logger
 import platform
 
+try:
+    # libyaml bindings, several times faster than the pure-Python loader
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
 
 class SiteSettings(BaseModel):
     title: str
@@ -45,26 +64,116 @@ class Config(BaseModel):
     search_method: Literal["fullmatch", "jieba"] = "fullmatch"
     cloudflare_analytics_token: Optional[str] = None
     friend_links: Optional[List[FriendLinkItem]] = None
+    prerender_pages: bool = False
 
     # Debug flags
     disable_template_cache: bool = False
 
 
-class PostMetadata(BaseModel):
+# Plain dataclass checked by hand: posts are loaded in bulk and pydantic's
+# validation was a large part of parsing them
+@dataclass(slots=True, frozen=True)
+class PostMetadata:
     title: str
     date: datetime.date
     last_modified: datetime.date
-    tags: list[str]
+    tags: List[str]
     description: str
     published: bool
     author: str
-    keywords: list[str] = []
+    keywords: List[str] = field(default_factory=list)
 
+    # Strings accepted for booleans, same as pydantic's lax mode
+    _BOOL_STRINGS = {
+        **dict.fromkeys(("1", "on", "t", "true", "y", "yes"), True),
+        **dict.fromkeys(("0", "off", "f", "false", "n", "no"), False),
+    }
 
-class Post(BaseModel):
+    @classmethod
+    def from_dict(cls, data: Any) -> "PostMetadata":
+        """
+        Builds post metadata from the parsed front matter.
+
+        Args:
+            data (Any): The front matter as loaded from YAML.
+
+        Returns:
+            PostMetadata: The checked metadata.
+
+        Raises:
+            ValueError: If a field is missing or has an unexpected type.
+        """
+        if not isinstance(data, dict):
+            raise ValueError("Post metadata must be a mapping.")
+        tags = cls._get(data, "tags", list)
+        keywords = cls._get(data, "keywords", list, [])
+        if not all(isinstance(keyword, str) for keyword in keywords):
+            raise ValueError("Field 'keywords' must be a list of strings.")
+        return cls(
+            title=cls._get(data, "title", str),
+            date=cls._get_date(data, "date"),
+            last_modified=cls._get_date(data, "last_modified"),
+            tags=[str(tag) for tag in tags],
+            description=cls._get(data, "description", str),
+            published=cls._get_bool(data, "published"),
+            author=cls._get(data, "author", str),
+            keywords=keywords,
+        )
+
+    @staticmethod
+    def _get(data: Dict[str, Any], name: str, kind: type, *default: Any) -> Any:
+        if name not in data:
+            if default:
+                return default[0]
+            raise ValueError(f"Field '{name}' is required.")
+        value = data[name]
+        if not isinstance(value, kind):
+            raise ValueError(f"Field '{name}' must be of type {kind.__name__}.")
+        return value
+
+    @classmethod
+    def _get_date(cls, data: Dict[str, Any], name: str) -> datetime.date:
+        value = cls._get(data, name, object)
+        if isinstance(value, datetime.datetime):
+            # Only midnight converts without losing information
+            if value.time() == datetime.time():
+                return value.date()
+        elif isinstance(value, datetime.date):
+            return value
+        elif isinstance(value, str):
+            try:
+                return datetime.date.fromisoformat(value)
+            except ValueError:
+                pass
+            # Quoted ISO datetimes, again only at midnight
+            try:
+                parsed = datetime.datetime.fromisoformat(value)
+            except ValueError:
+                pass
+            else:
+                if parsed.time() == datetime.time():
+                    return parsed.date()
+        raise ValueError(f"Field '{name}' must be a date.")
+
+    @classmethod
+    def _get_bool(cls, data: Dict[str, Any], name: str) -> bool:
+        value = cls._get(data, name, object)
+        if isinstance(value, bool):
+            return value
+        if isinstance(value, (int, str)):
+            result = cls._BOOL_STRINGS.get(str(value).lower())
+            if result is not None:
+                return result
+        raise ValueError(f"Field '{name}' must be a boolean.")
+
+
+@dataclass(slots=True, frozen=True)
+class Post:
+    # Built from already validated metadata, so no pydantic model is needed here
     metadata: PostMetadata
     content: str
     slug: str
+    hljs_languages: List[str] = field(default_factory=list)
 
 
 class Tag(BaseModel):
@@ -82,28 +191,73 @@ def load_config(filename: str = "config.json") -> Config:
     return config
 
 
+class BestEffortBytecodeCache(FileSystemBytecodeCache):
+    """
+    Bytecode cache that compiles templates afresh when their cache files cannot be
+    read or written, instead of failing the render.
+    """
+
+    def load_bytecode(self, bucket) -> None:
+        try:
+            super().load_bytecode(bucket)
+        except OSError as e:
+            logger.warning(f"Error reading template bytecode cache: {e}")
+
+    def dump_bytecode(self, bucket) -> None:
+        try:
+            super().dump_bytecode(bucket)
+        except OSError as e:
+            logger.warning(f"Error writing template bytecode cache: {e}")
+
+
 class TemplateRenderer:
     def __init__(
         self,
         template_dir: str = "templates",
         disable_cache: bool = False,
         static_params: Dict[str, Any] = {},
+        bytecode_cache_dir: str = ".jinja_cache",
     ) -> None:
         self.template_dir = template_dir
         self.disable_cache = disable_cache
+        bytecode_cache = None
+        if not disable_cache:
+            # Lets later processes skip parsing and compiling the templates, but
+            # only where the directory is writable, e.g. not on a read-only root
+            try:
+                os.makedirs(bytecode_cache_dir, exist_ok=True)
+                if not os.access(bytecode_cache_dir, os.W_OK):
+                    raise PermissionError(f"{bytecode_cache_dir} is not writable")
+                bytecode_cache = BestEffortBytecodeCache(bytecode_cache_dir)
+            except OSError as e:
+                logger.warning(f"Template bytecode cache disabled: {e}")
         self.env = Environment(
-            loader=FileSystemLoader(template_dir), autoescape=select_autoescape()
+            loader=FileSystemLoader(template_dir),
+            autoescape=select_autoescape(),
+            auto_reload=disable_cache,
+            # Whitespace around block tags is dropped once at compile time,
+            # leaving less for the minifier to scan on every render
+            trim_blocks=True,
+            lstrip_blocks=True,
+            cache_size=-1,
+            bytecode_cache=bytecode_cache,
         )
         self.env.filters["urlencode"] = lambda s: quote(s, safe="")
-        self.templates = {}
-        self.static_params = static_params
+        # Same for every render, so they live in the globals instead of each context
+        self.env.globals.update(static_params)
+        # Compile everything up front, Jinja's own cache serves them from then on
+        for name in os.listdir(template_dir):
+            if name.endswith(".html"):
+                self.env.get_template(name)
+
+    def update_static_params(self, **params: Any) -> None:
+        self.env.globals.update(params)
 
     def render_to_plain_text(self, template_name: str, **context) -> str:
-        if self.disable_cache or template_name not in self.templates:
-            self.templates[template_name] = self.env.get_template(template_name)
-        context.update(self.static_params)
-        rendered_text = self.templates[template_name].render(**context)
-        return htmlmin.minify(rendered_text)
+        rendered_text = self.env.get_template(template_name).render(**context)
+        return minify_html.minify(
+            rendered_text, minify_css=True, minify_js=True, keep_closing_tags=True
+        )
 
     def render(
         self, template_name: str, status_code: int = 200, **context
@@ -117,6 +271,10 @@ class TemplateRenderer:
         return destination
 
 
+# Line closing the front matter, with either line ending
+_FRONT_MATTER_END_RE = re.compile(r"\r?\n---\r?(?:\n|\Z)")
+
+
 def parse_post(content: str) -> Tuple[PostMetadata, str]:
     """
     Parses a post from its content.
@@ -127,22 +285,15 @@ def parse_post(content: str) -> Tuple[PostMetadata, str]:
     Returns:
         Tuple[PostMetadata, str]: A tuple containing the metadata and the rest content of the post (hopefully) in markdown.
     """
-    metadata_lines = []
-    content_lines = []
-    metadata_end = False
-    for line in content.split("\n"):
-        if line == "---":
-            metadata_end = True
-            continue
-        if not metadata_end:
-            metadata_lines.append(line)
-        else:
-            content_lines.append(line)
-    metadata = yaml.safe_load("\n".join(metadata_lines))
-    if isinstance(metadata.get("tags"), list):
-        metadata["tags"] = [str(tag) for tag in metadata["tags"]]
-    metadata = PostMetadata.model_validate(metadata)
-    return metadata, "\n".join(content_lines)
+    if content.startswith(("---\n", "---\r\n")):
+        content = content[content.index("\n") + 1 :]
+    match = _FRONT_MATTER_END_RE.search(content)
+    if match:
+        metadata_text, content = content[: match.start()], content[match.end() :]
+    else:
+        metadata_text, content = content, ""
+    metadata = PostMetadata.from_dict(yaml.load(metadata_text, Loader=SafeLoader))
+    return metadata, content
 
 
 def get_amiablog_version():
@@ -171,17 +322,44 @@ def get_platform_string():
 
 
 class PostsManager:
+    # Ordering name -> (sort key, reverse)
+    _ORDERINGS: Dict[str, Tuple[Callable[[Post], Any], bool]] = {
+        "date": (attrgetter("metadata.date"), False),
+        "date_desc": (attrgetter("metadata.date"), True),
+        "modified": (attrgetter("metadata.last_modified"), False),
+        "modified_desc": (attrgetter("metadata.last_modified"), True),
+    }
+    # Bump whenever the pickled parse results change shape
+    _POST_CACHE_VERSION = 2
+
     def __init__(
         self,
         posts_dir: str = "posts",
         search_method: Literal["fullmatch", "jieba"] = "fullmatch",
         build_search_index: bool = True,
+        hljs_manager: Optional["HLJSLanguageManager"] = None,
+        post_cache_file: Optional[str] = ".posts_cache.pkl",
     ) -> None:
         self.posts_dir = posts_dir
+        self.hljs_manager = hljs_manager
+        # Post path -> (st_mtime_ns, st_size, metadata, content), so unchanged
+        # posts are not parsed again on restart
+        self.post_cache_file = post_cache_file
+        self.post_cache: Dict[str, Tuple[int, int, PostMetadata, str]] = (
+            self._read_post_cache()
+        )
         self.posts: Dict[str, Post] = {}
         self.tags: Dict[str, Tag] = {}
+        # Lowercased tag -> posts carrying it, for case-insensitive tag lookups
+        self.tag_posts: Dict[str, List[Post]] = {}
+        # Posts only change on reload, so their orderings are sorted once and reused
+        # Tuples, since the same sequences are handed out to every caller
+        self.sorted_posts: Dict[str, Tuple[Post, ...]] = {}
+        self.sorted_tag_posts: Dict[Tuple[str, str], Tuple[Post, ...]] = {}
         self.search_index: Optional[sqlite3.Connection] = None
         self.search_method: Literal["fullmatch", "jieba"] = search_method
+        # Bumped on every (re)load so caches built on top of the posts know when to drop
+        self.version = 0
         if self.search_method == "jieba":
             logger.info("Initializing jieba predix dict")
             jieba_fast.initialize()
@@ -195,24 +373,31 @@ class PostsManager:
         # Clear posts & db
         self.posts.clear()
         self.tags.clear()
+        self.tag_posts.clear()
+        self.sorted_posts.clear()
+        self.sorted_tag_posts.clear()
         if self.search_index:
             self.search_index.close()
             self.search_index = None
         logger.info("Loading posts")
         start_time = time.time()
-        for filename in os.listdir(self.posts_dir):
-            if filename.endswith(".md"):
-                with open(os.path.join(self.posts_dir, filename), "r") as f:
-                    content = f.read()
-                try:
-                    metadata, content = parse_post(content)
-                except Exception as e:
-                    logger.error(f"Error parsing post {filename}, ignoring: {e}")
-                    continue
-                if not metadata.published:
-                    continue
-                slug = ".".join(filename.split(".")[:-1])
-                self.posts[slug] = Post(metadata=metadata, content=content, slug=slug)
+        with os.scandir(self.posts_dir) as entries:
+            post_files = [
+                entry
+                for entry in entries
+                if entry.name.endswith(".md") and entry.is_file()
+            ]
+        # Read and parse the files concurrently, then add them in directory order
+        post_cache: Dict[str, Tuple[int, int, PostMetadata, str]] = {}
+        with ThreadPoolExecutor() as executor:
+            for post in executor.map(
+                lambda entry: self._load_post(entry, post_cache), post_files
+            ):
+                if post is not None:
+                    self.posts[post.slug] = post
+        if post_cache != self.post_cache:
+            self.post_cache = post_cache
+            self._write_post_cache()
         end_time = time.time()
         logger.info(
             f"Loaded {len(self.posts)} posts in {(end_time - start_time)*1000:.4f}ms"
@@ -222,14 +407,85 @@ class PostsManager:
         self._build_tag_index()
         end_time = time.time()
         logger.info(f"Built tag index in {(end_time - start_time)*1000000:.4f}us")
+        for key in self._ORDERINGS:
+            self.sorted_posts[key] = tuple(
+                self.order_by(list(self.posts.values()), key)
+            )
         if build_search_index:
             logger.info("Building search index")
             start_time = time.time()
             self._build_search_index()
             end_time = time.time()
             logger.info(f"Built search index in {(end_time - start_time)*1000:.4f}ms")
+        self.version += 1
         logger.info("Finished loading posts")
 
+    def _load_post(
+        self,
+        entry: os.DirEntry,
+        post_cache: Dict[str, Tuple[int, int, PostMetadata, str]],
+    ) -> Optional[Post]:
+        stat = entry.stat()
+        cached = self.post_cache.get(entry.path)
+        if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            metadata, content = cached[2], cached[3]
+        else:
+            # The size is already known from the stat, so read it in one call
+            fd = os.open(entry.path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+            try:
+                content = os.read(fd, stat.st_size).decode()
+            finally:
+                os.close(fd)
+            if "\r" in content:
+                # Same newline translation as reading in text mode
+                content = content.replace("\r\n", "\n").replace("\r", "\n")
+            try:
+                metadata, content = parse_post(content)
+            except Exception as e:
+                logger.error(f"Error parsing post {entry.name}, ignoring: {e}")
+                return None
+        post_cache[entry.path] = (stat.st_mtime_ns, stat.st_size, metadata, content)
+        if not metadata.published:
+            return None
+        slug = entry.name[:-3]
+        hljs_languages = (
+            self.hljs_manager.get_available_languages(content)
+            if self.hljs_manager
+            else []
+        )
+        return Post(
+            metadata=metadata,
+            content=content,
+            slug=slug,
+            hljs_languages=hljs_languages,
+        )
+
+    def _read_post_cache(self) -> Dict[str, Tuple[int, int, PostMetadata, str]]:
+        if not self.post_cache_file:
+            return {}
+        try:
+            with open(self.post_cache_file, "rb") as f:
+                version, post_cache = pickle.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning(f"Error reading post cache, ignoring: {e}")
+            return {}
+        return post_cache if version == self._POST_CACHE_VERSION else {}
+
+    def _write_post_cache(self) -> None:
+        if not self.post_cache_file:
+            return
+        try:
+            with open(self.post_cache_file, "wb") as f:
+                pickle.dump(
+                    (self._POST_CACHE_VERSION, self.post_cache),
+                    f,
+                    protocol=pickle.HIGHEST_PROTOCOL,
+                )
+        except OSError as e:
+            logger.warning(f"Error writing post cache: {e}")
+
     def _build_tag_index(self):
         for post in self.posts.values():
             for tag in post.metadata.tags:
@@ -237,27 +493,66 @@ class PostsManager:
                     self.tags[tag] = Tag(name=tag, count=1)
                 else:
                     self.tags[tag].count += 1
+            for tag in dict.fromkeys(tag.lower() for tag in post.metadata.tags):
+                self.tag_posts.setdefault(tag, []).append(post)
 
     def _build_search_index(self):
         db = sqlite3.connect(":memory:")
         cursor = db.cursor()
-        cursor.execute(
-            "CREATE TABLE posts (id INTEGER PRIMARY KEY, slug TEXT, title TEXT, tags TEXT, content TEXT, keywords TEXT)"
-        )
-        for post in self.posts.values():
+        if self.search_method == "jieba":
+            # Full-text index over the jieba-segmented text, so every query token
+            # becomes an index lookup instead of a scan over all posts
             cursor.execute(
-                "INSERT INTO posts (slug, title, tags, content, keywords) VALUES (?, ?, ?, ?, ?)",
+                "CREATE VIRTUAL TABLE posts USING fts5(slug UNINDEXED, title, tags, content, keywords)"
+            )
+            rows = (
+                (
+                    post.slug,
+                    self._segment(post.metadata.title),
+                    self._segment(" ".join(post.metadata.tags)),
+                    self._segment(post.content),
+                    self._segment(" ".join(post.metadata.keywords)),
+                )
+                for post in self.posts.values()
+            )
+        else:
+            cursor.execute(
+                "CREATE TABLE posts (id INTEGER PRIMARY KEY, slug TEXT, title TEXT, tags TEXT, content TEXT, keywords TEXT)"
+            )
+            rows = (
                 (
                     post.slug,
                     post.metadata.title.lower(),
                     ",".join(post.metadata.tags).lower(),
                     post.content.lower(),
                     ",".join(post.metadata.keywords).lower(),
-                ),
+                )
+                for post in self.posts.values()
             )
+        # One statement for all posts, committed as a single transaction
+        cursor.executemany(
+            "INSERT INTO posts (slug, title, tags, content, keywords) VALUES (?, ?, ?, ?, ?)",
+            rows,
+        )
         db.commit()
         self.search_index = db
 
+    def _segment(self, text: str) -> str:
+        # Search mode also emits the words inside compounds, e.g. "大学" in
+        # "北京大学", so queries for them still find the post
+        return " ".join(jieba_fast.cut_for_search(text.lower()))
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _jieba_match_query(keyword: str) -> str:
+        # Cached since popular queries repeat; quoted prefix terms, so every
+        # token is matched literally
+        return " OR ".join(
+            '"' + kw.replace('"', '""') + '"*'
+            for kw in jieba_fast.cut(keyword)
+            if kw.strip()
+        )
+
     def list_tags(
         self, order_by: Literal["default", "post_count"] = "default"
     ) -> List[Tag]:
@@ -268,8 +563,27 @@ class PostsManager:
                 list(self.tags.values()), key=lambda tag: tag.count, reverse=True
             )
 
-    def recent_posts(self, n: int = 5) -> List[Post]:
-        return self.order_by(list(self.posts.values()), "modified_desc")[:n]
+    def recent_posts(self, n: int = 5) -> Tuple[Post, ...]:
+        return self.sorted_posts["modified_desc"][:n]
+
+    def ordered_posts(
+        self, key: Literal["date", "date_desc", "modified", "modified_desc"]
+    ) -> Tuple[Post, ...]:
+        return self.sorted_posts[key]
+
+    def ordered_posts_by_tag(
+        self,
+        tag: str,
+        key: Literal["date", "date_desc", "modified", "modified_desc"],
+    ) -> Tuple[Post, ...]:
+        cache_key = (tag.lower(), key)
+        posts = self.sorted_tag_posts.get(cache_key)
+        if posts is None:
+            posts = tuple(self.order_by(self.get_posts_by_tag(tag), key))
+            # Only remember tags that exist, the tag comes straight from the URL
+            if posts:
+                self.sorted_tag_posts[cache_key] = posts
+        return posts
 
     def get_posts(self, selector: Callable[[Post], bool]) -> List[Post]:
         return [post for post in self.posts.values() if selector(post)]
@@ -290,21 +604,16 @@ class PostsManager:
             )
             results = [self.posts[row[0]] for row in cursor.fetchall()]
         elif self.search_method == "jieba":
-            keywords = jieba_fast.lcut(keyword.lower())
-            cursor = self.search_index.cursor()
-            hits: Dict[str, int] = {}
-            for kw in keywords:
+            match_query = self._jieba_match_query(keyword.lower())
+            results = []
+            if match_query:
+                # One query for all tokens, best bm25 matches first
+                cursor = self.search_index.cursor()
                 cursor.execute(
-                    "SELECT slug FROM posts WHERE title LIKE ? OR tags LIKE ? OR content LIKE ? OR keywords LIKE ?",
-                    (f"%{kw}%", f"%{kw}%", f"%{kw}%", f"%{kw}%"),
+                    "SELECT slug FROM posts WHERE posts MATCH ? ORDER BY rank",
+                    (match_query,),
                 )
-                for row in cursor.fetchall():
-                    slug = row[0]
-                    hits[slug] = hits.get(slug, 0) + 1
-            sorted_slugs = sorted(
-                hits.keys(), key=lambda slug: hits[slug], reverse=True
-            )
-            results = [self.posts[slug] for slug in sorted_slugs]
+                results = [self.posts[row[0]] for row in cursor.fetchall()]
         else:
             raise ValueError("Invalid search method.")
         end_time = time.time()
@@ -314,28 +623,17 @@ class PostsManager:
         return results
 
     def get_posts_by_tag(self, tag: str, limit: Optional[int] = None) -> List[Post]:
-        results = self.get_posts(
-            lambda post: tag.lower() in [tag.lower() for tag in post.metadata.tags]
-        )
-        if limit is not None:
-            results = results[:limit]
-        return results
+        return self.tag_posts.get(tag.lower(), [])[:limit]
 
     def order_by(
         self,
         posts: List[Post],
         key: Literal["date", "date_desc", "modified", "modified_desc"],
     ):
-        if key == "date":
-            return sorted(posts, key=lambda x: x.metadata.date)
-        elif key == "date_desc":
-            return sorted(posts, key=lambda x: x.metadata.date, reverse=True)
-        elif key == "modified":
-            return sorted(posts, key=lambda x: x.metadata.last_modified)
-        elif key == "modified_desc":
-            return sorted(posts, key=lambda x: x.metadata.last_modified, reverse=True)
-        else:
+        if key not in self._ORDERINGS:
             raise ValueError(f"Invalid key: {key}")
+        sort_key, reverse = self._ORDERINGS[key]
+        return sorted(posts, key=sort_key, reverse=reverse)
 
 
 class I18nTerm:
@@ -360,21 +658,44 @@ class I18nProvider:
     def __init__(self, language: str = "en") -> None:
         self.language = language
         self.translations = {}
+        # Untranslated keys are looked up on every render, so reuse their terms
+        self.missing_terms: Dict[str, I18nTerm] = {}
         self.load_translations()
 
     def load_translations(self) -> None:
         with open(f"languages/{self.language}.json", "r") as f:
             terms = json.load(f)
-        self.translations = {key: I18nTerm(key, term) for key, term in terms.items()}
+        for key, term in self.translations.items():
+            if self.__dict__.get(key) is term:
+                del self.__dict__[key]
+        # Interned like attribute names, so key comparisons are identity checks
+        self.translations = {
+            sys.intern(key): I18nTerm(sys.intern(key), term)
+            for key, term in terms.items()
+        }
+        self.missing_terms.clear()
+        # Terms also become instance attributes, so lookups like `i18n.search` are
+        # found directly and only untranslated keys fall through to __getattr__
+        for key, term in self.translations.items():
+            if key not in self.__dict__ and not hasattr(type(self), key):
+                self.__dict__[key] = term
 
     def __getattr__(self, key: str) -> I18nTerm:
-        return self.translations.get(key, I18nTerm(key, None))
+        term = self.translations.get(key)
+        if term is None:
+            term = self.missing_terms.get(key)
+            if term is None:
+                term = self.missing_terms[key] = I18nTerm(key, None)
+        return term
 
 
 class HLJSLanguageManager:
+    # Language tag of an opening code fence, e.g. "python" in "```python title"
+    _FENCE_RE = re.compile(r"^[^\S\n]*```[^\S\n]*(\S+)", re.MULTILINE)
+
     def __init__(self, languages: List[str]):
         self.languages = languages
-        self.available_languages = []
+        self.available_languages: Set[str] = set()
         self.download()
 
     def download(
@@ -383,47 +704,77 @@ class HLJSLanguageManager:
         url_prefix: str = "https://cdn.jsdelivr.net/gh/highlightjs/cdn-release@11.11.1/build/languages/",
     ):
         undownloaded_languages = []
-        files = os.listdir(prefix)
+        files = set(os.listdir(prefix))
         for language in self.languages:
             if f"{language}.min.js" not in files:
                 undownloaded_languages.append(language)
             else:
-                self.available_languages.append(language)
+                self.available_languages.add(language)
         if not undownloaded_languages:
             return
         logger.info(f"Downloading {len(undownloaded_languages)} HLJS languages...")
-        for language in undownloaded_languages:
-            try:
-                response = httpx.get(f"{url_prefix}{language}.min.js")
-                response.raise_for_status()
-                with open(os.path.join(prefix, f"{language}.min.js"), "wb") as f:
-                    f.write(response.content)
-            except Exception as e:
-                logger.warning(f"Failed to download {language}.min.js: {e}, skipping.")
-            else:
-                logger.info(f"Successfully downloaded {language}.min.js")
-                self.available_languages.append(language)
+        # Fetch concurrently so startup waits for the slowest file, not the sum of all,
+        # over one pooled client so connections to the CDN are reused
+        with (
+            httpx.Client(limits=httpx.Limits(max_keepalive_connections=8)) as client,
+            ThreadPoolExecutor(max_workers=8) as executor,
+        ):
+            downloaded = executor.map(
+                lambda language: self._download_language(
+                    client, language, prefix, url_prefix
+                ),
+                undownloaded_languages,
+            )
+            for language, success in zip(undownloaded_languages, downloaded):
+                if success:
+                    self.available_languages.add(language)
         logger.info("Download complete!")
 
-    def get_markdown_languages(self, markdown_text: str):
-        languages = []
-        lines = markdown_text.splitlines()
-
-        for line in lines:
-            clean_line = line.lstrip()
-            if clean_line.startswith("```"):
-                language_tag = clean_line[3:].strip()
-                if language_tag:
-                    lang = language_tag.split()[0]
-                    languages.append(lang)
-
-        return languages
+    def _download_language(
+        self, client: httpx.Client, language: str, prefix: str, url_prefix: str
+    ) -> bool:
+        try:
+            response = client.get(f"{url_prefix}{language}.min.js")
+            response.raise_for_status()
+            with open(os.path.join(prefix, f"{language}.min.js"), "wb") as f:
+                f.write(response.content)
+        except Exception as e:
+            logger.warning(f"Failed to download {language}.min.js: {e}, skipping.")
+            return False
+        logger.info(f"Successfully downloaded {language}.min.js")
+        return True
+
+    def get_markdown_languages(self, markdown_text: str) -> List[str]:
+        return self._FENCE_RE.findall(markdown_text)
+
+    def get_available_languages(self, markdown_text: str) -> List[str]:
+        """
+        Returns the downloaded languages used in the markdown, in order of appearance and without duplicates.
+        """
+        return [
+            language
+            for language in dict.fromkeys(self.get_markdown_languages(markdown_text))
+            if language in self.available_languages
+        ]
 
 
 class RSSProvider:
     def __init__(self, config: Config, posts_manager: PostsManager):
         self.config = config
         self.posts_manager = posts_manager
+        # (posts version, encoded feed, etag) of the last generated default feed
+        self.cached_feed: Optional[Tuple[int, bytes, str]] = None
+
+    def get_feed(self) -> Tuple[bytes, str]:
+        """
+        Returns the encoded default feed and its ETag, regenerating it only after posts are reloaded.
+        """
+        version = self.posts_manager.version
+        if self.cached_feed is None or self.cached_feed[0] != version:
+            feed = self.generate_rss().encode()
+            etag = f'"{hashlib.sha256(feed).hexdigest()}"'
+            self.cached_feed = (version, feed, etag)
+        return self.cached_feed[1], self.cached_feed[2]
 
     def _format_rfc822_date(self, dt: datetime.date) -> str:
         dt_datetime = datetime.datetime(dt.year, dt.month, dt.day, 12, 0, 0)
@@ -436,16 +787,13 @@ class RSSProvider:
         else:
             site_url = site_settings.site_url.rstrip("/")
 
-        posts = self.posts_manager.order_by(
-            list(self.posts_manager.posts.values()), "modified_desc"
-        )
-        if limit is not None:
-            posts = posts[:limit]
+        posts = self.posts_manager.ordered_posts("modified_desc")[:limit]
 
         # Build channel info
         channel_title = escape(site_settings.title)
         channel_description = escape(site_settings.description)
         channel_link = escape(site_url)
+        language = escape(self.config.site_language)
 
         # Use current time as lastBuildDate
         last_build_date = self._format_rfc822_date(datetime.date.today())
@@ -469,19 +817,17 @@ class RSSProvider:
         rss_parts.append(
             f'    <atom:link href="{channel_link}/feed" rel="self" type="application/rss+xml" />'
         )
-        rss_parts.append(
-            f"    <language>{escape(self.config.site_language)}</language>"
-        )
+        rss_parts.append(f"    <language>{language}</language>")
         if self.config.copyright:
             rss_parts.append(
                 f"    <copyright>{escape(self.config.copyright.name)} {escape(self.config.copyright.refer)}</copyright>"
             )
 
-        # Add items for each post
+        # Add items for each post, with the parts shared by every item built once
+        post_url_prefix = f"{site_url}/post/"
+        post_url_suffix = ".html" if is_static else ""
         for post in posts:
-            post_url = f"{site_url}/post/{post.slug}"
-            if is_static:
-                post_url += ".html"
+            post_url = f"{post_url_prefix}{post.slug}{post_url_suffix}"
             title = escape(post.metadata.title)
             description = escape(post.metadata.description)
             pub_date = self._format_rfc822_date(post.metadata.date)
@@ -496,7 +842,7 @@ class RSSProvider:
             rss_parts.append(f"      <guid>{guid}</guid>")
             rss_parts.append(f"      <author>{author}</author>")
             rss_parts.append(
-                f'      <content:encoded xml:lang="{escape(self.config.site_language)}"><![CDATA[{post.content}]]></content:encoded>'
+                f'      <content:encoded xml:lang="{language}"><![CDATA[{post.content}]]></content:encoded>'
             )
             # Add categories (tags)
             for tag in post.metadata.tags:
@@ -508,3 +854,31 @@ class RSSProvider:
         rss_parts.append("</rss>")
 
         return "\n".join(rss_parts)
+
+
+class ResponseCache:
+    """
+    Caches rendered responses of pages that only depend on the loaded posts.
+
+    Entries are dropped whenever the posts manager reloads its posts.
+    """
+
+    def __init__(self, posts_manager: PostsManager, disabled: bool = False) -> None:
+        self.posts_manager = posts_manager
+        self.disabled = disabled
+        self.version = posts_manager.version
+        self.responses: Dict[Tuple[Any, ...], Tuple[bytes, int, Optional[str]]] = {}
+
+    def get(self, key: Tuple[Any, ...], render: Callable[[], Response]) -> Response:
+        if self.disabled:
+            return render()
+        if self.version != self.posts_manager.version:
+            self.responses.clear()
+            self.version = self.posts_manager.version
+        cached = self.responses.get(key)
+        if cached is None:
+            response = render()
+            cached = (bytes(response.body), response.status_code, response.media_type)
+            self.responses[key] = cached
+        body, status_code, media_type = cached
+        return Response(content=body, status_code=status_code, media_type=media_type)